@@ -1,4 +1,5 @@
 import logging
+import os
 import sys
 from pathlib import Path
 
@@ -7,28 +8,39 @@ from config import (
     Config,
     create_default_config_if_not_exists,
     load_last_config,
+    load_ticker_names,
     save_last_config,
+    save_ticker_names,
     setup_signal_handlers,
 )
-from yf_api import get_company_name_from_ticker
 
 logger = logging.getLogger("notes_app")
 
 
 def setup_logging() -> None:
     """Set up logging configuration."""
+    # Skip per-record thread/process lookups, the format doesn't use them
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
     logging.basicConfig(
         stream=sys.stdout,
         level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
+        format="%(levelname)s %(message)s",
     )
     logging.info("Logging setup complete.")
 
 
 def initial_setup() -> None:
-    """Perform initial setup for the application."""
+    """Perform initial setup for the application.
 
-    if not CONFIG_DIR.exists():
+    The config directory is created without asking unless the
+    NOTES_APP_CONFIRM_MKDIR environment variable is set.
+    """
+
+    if not os.environ.get("NOTES_APP_CONFIRM_MKDIR"):
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    elif not CONFIG_DIR.exists():
         print("Config directory does not exist, do you want to create it? (y/n)")
         if input().strip().lower() == "y":
             CONFIG_DIR.mkdir(parents=True, exist_ok=True)
@@ -53,12 +65,27 @@ def main():
     # Setup signal handlers for graceful shutdown
     setup_signal_handlers(config)
 
-    for ticker in config.contents.get("tickers", []):
-        company_name = get_company_name_from_ticker(ticker)
-        logger.info(f"Ticker: {ticker}, Company Name: {company_name}")
+    tickers = config.contents.get("tickers", [])
+    if tickers:
+        # Company names rarely change, so only look up the ones not seen before
+        ticker_names = load_ticker_names()
+        missing = [ticker for ticker in tickers if ticker not in ticker_names]
+        if missing:
+            # yf_api pulls in yfinance and pandas, only pay for it when needed
+            from yf_api import get_company_names_from_tickers
+
+            company_names = get_company_names_from_tickers(missing)
+            found = {t: n for t, n in zip(missing, company_names) if n is not None}
+            if found:
+                ticker_names.update(found)
+                save_ticker_names(ticker_names)
+
+        for ticker in tickers:
+            company_name = ticker_names.get(ticker)
+            logger.info(f"Ticker: {ticker}, Company Name: {company_name}")
     
     # Save config on normal exit too
-    save_last_config(config.config_path)
+    save_last_config(config.config_path, config)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger("notes_app.cache")
+
+
+class TTLCache:
+    """Persistent key/value cache where each lookup decides how old is too old.
+
+    Values are stored as JSON in a sqlite3 database, so they must be JSON
+    serializable and not None. Database errors are logged and treated as
+    cache misses, a broken cache never breaks a lookup.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connect on first use so importing a module that owns a cache is free
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str, max_age: float) -> Optional[Any]:
+        """Return the value under `key` if it is at most `max_age` seconds old."""
+        with self._lock:
+            try:
+                row = (
+                    self._connection()
+                    .execute(
+                        "SELECT value, stored_at FROM entries WHERE key = ?", (key,)
+                    )
+                    .fetchone()
+                )
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Error reading {key} from cache: {e}")
+                return None
+
+        if row is None or time.time() - row[1] > max_age:
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` under `key`, stamped with the current time."""
+        with self._lock:
+            try:
+                self._connection().execute(
+                    "INSERT OR REPLACE INTO entries (key, value, stored_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, json.dumps(value), time.time()),
+                )
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Error writing {key} to cache: {e}")
+
+    def delete(self, key: str) -> None:
+        """Remove the entry under `key`, if there is one."""
+        with self._lock:
+            try:
+                self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Error deleting {key} from cache: {e}")
+
+    def close(self) -> None:
+        """Close the database connection, it is reopened on next use."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,103 +1,244 @@
-import json
+import copy
+import functools
 import logging
-import signal
+import os
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+try:
+    import orjson
+
+    def _json_loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+except ImportError:
+
+    def _json_loads(data: bytes) -> Any:
+        import json
+
+        return json.loads(data)
+
+    def _json_dumps(obj: Any) -> bytes:
+        import json
+
+        return json.dumps(obj, indent=2).encode()
+
 
 logger = logging.getLogger("notes_app.config")
 
-CONFIG_DIR = Path.home() / ".config" / "notes-app"
-CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-LAST_CONFIG_FILE = CONFIG_DIR / ".last_config"
+_CONFIG_DIR_STR = os.path.join(os.path.expanduser("~"), ".config", "notes-app")
+CONFIG_DIR = Path(_CONFIG_DIR_STR)
+LAST_CONFIG_FILE = Path(_CONFIG_DIR_STR, ".last_config")
 DEFAULT_DATA_FILE_NAME = "scn_data.json"
-DEFAULT_DATA_FILE = CONFIG_DIR / DEFAULT_DATA_FILE_NAME
+DEFAULT_DATA_FILE = Path(_CONFIG_DIR_STR, DEFAULT_DATA_FILE_NAME)
+TICKER_NAMES_FILE = Path(_CONFIG_DIR_STR, ".ticker_names.json")
+
+# (LAST_CONFIG_FILE, saved path) of the last write, to skip identical rewrites
+_last_saved: Optional[Tuple[Path, str]] = None
+
+# Parsed config contents keyed by path, tagged with the mtime they were read at
+_config_cache: Dict[Path, Tuple[Tuple[int, int, int], Dict]] = {}
 
 
-@dataclass
+@dataclass(slots=True)
 class Config:
     """Configuration storage for the notes app."""
 
     config_path: Path
     contents: Dict
+    # str(config_path.absolute()), filled in by the first save_last_config
+    absolute_path: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
 
-def save_last_config(file_path: Path) -> None:
-    """Save the path of the last used config file."""
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file through a temporary sibling so it is never left half written."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def save_last_config(file_path: Path, config: Optional[Config] = None) -> None:
+    """Save the path of the last used config file.
+
+    If the loaded ``config`` for ``file_path`` is passed, its resolved absolute
+    path is cached on it so later saves skip the lookup. A ``config`` loaded
+    from a different path is ignored.
+    """
+    if config is None or file_path != config.config_path:
+        absolute_path = str(file_path.absolute())
+    else:
+        if config.absolute_path is None:
+            config.absolute_path = str(file_path.absolute())
+        absolute_path = config.absolute_path
+
+    # main and the signal handler may both save on the way out
+    global _last_saved
+    if _last_saved == (LAST_CONFIG_FILE, absolute_path):
+        return
+
     LAST_CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(LAST_CONFIG_FILE, "w") as f:
-        f.write(str(file_path.absolute()))
+    _write_atomic(LAST_CONFIG_FILE, os.fsencode(absolute_path))
+    _last_saved = (LAST_CONFIG_FILE, absolute_path)
+    load_last_config.cache_clear()
 
 
-def load_last_config() -> Config:
-    """Load the last used config file, or fallback to default."""
+def _open_config_dir() -> Optional[int]:
+    """Open CONFIG_DIR for fd-relative reads, or return None if not possible."""
+    if os.open not in os.supports_dir_fd:
+        return None
+    try:
+        return os.open(CONFIG_DIR, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return None
+
+
+def _open_fd(path: Path, dir_fd: Optional[int] = None) -> int:
+    """Open a file for reading, relative to ``dir_fd`` when it lives there.
+
+    Opening relative to an already open directory skips resolving and
+    permission checking every component of the full path again.
+    """
+    flags = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+    if dir_fd is not None and path.parent == CONFIG_DIR:
+        return os.open(path.name, flags, dir_fd=dir_fd)
+    return os.open(path, flags)
 
-    config_file_to_load = DEFAULT_DATA_FILE
 
-    # Check if we have a last config file reference
-    if LAST_CONFIG_FILE.exists():
+def _open_file(path: Path, dir_fd: Optional[int] = None) -> BinaryIO:
+    """Open a file as a binary file object, see _open_fd."""
+    return open(_open_fd(path, dir_fd), "rb")
+
+
+def _read_file(path: Path, dir_fd: Optional[int] = None) -> bytes:
+    """Read a whole file, see _open_file."""
+    with _open_file(path, dir_fd) as f:
+        return f.read()
+
+
+def _read_config(path: Path, dir_fd: Optional[int] = None) -> Optional[Dict]:
+    """Read and parse a config file, returning None if it is missing or invalid.
+
+    Parsed contents are reused while the file's mtime, size and inode are all
+    unchanged, a rewrite within one mtime tick still changes the size or, when
+    replaced, the inode. Callers get their own copy of the contents.
+    """
+    try:
+        with _open_file(path, dir_fd) as f:
+            stat = os.fstat(f.fileno())
+            version = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            cached = _config_cache.get(path)
+            if cached is not None and cached[0] == version:
+                return copy.deepcopy(cached[1])
+            contents = _json_loads(f.read())
+    except FileNotFoundError:
+        logger.info(f"Config file {path} not found")
+        return None
+    except (OSError, ValueError) as e:
+        logger.error(f"Error loading config file {path}: {e}")
+        return None
+
+    _config_cache[path] = (version, contents)
+    return copy.deepcopy(contents)
+
+
+def _read_last_config_reference(dir_fd: Optional[int] = None) -> Optional[Path]:
+    """Read the path stored in LAST_CONFIG_FILE, if there is a usable one."""
+    try:
+        # The file only holds one path, a single read avoids any buffering layers
+        fd = _open_fd(LAST_CONFIG_FILE, dir_fd)
         try:
-            with open(LAST_CONFIG_FILE, "r") as f:
-                last_config_path = Path(f.read().strip())
-                if last_config_path.exists():
-                    config_file_to_load = last_config_path
-                    logger.info(f"Loading last used config: {config_file_to_load}")
-                else:
-                    logger.info(
-                        f"Last config file {last_config_path} not found, using default"
-                    )
-        except (FileNotFoundError, IOError) as e:
-            logger.warning(f"Error reading last config reference: {e}, using default")
-    else:
+            data = os.read(fd, 4096)
+        finally:
+            os.close(fd)
+        return Path(os.fsdecode(data.strip()))
+    except FileNotFoundError:
         logger.info(
             f"No last config reference found, using default: {DEFAULT_DATA_FILE}"
         )
+    except (OSError, ValueError) as e:
+        logger.warning(f"Error reading last config reference: {e}, using default")
+    return None
+
 
-    # Load the actual config file
+def _load_last_config_uncached() -> Config:
+    """Load the last used config file, or fallback to default."""
+    dir_fd = _open_config_dir()
     try:
-        with open(config_file_to_load, "r") as f:
-            contents = json.load(f)
-            return Config(config_path=config_file_to_load, contents=contents)
-    except (FileNotFoundError, IOError, json.JSONDecodeError) as e:
-        logger.error(f"Error loading config file {config_file_to_load}: {e}")
-        # If even the default fails, create it and return empty config
-        if config_file_to_load == DEFAULT_DATA_FILE:
-            logger.info("Creating new default config file")
-            default_contents = {"tickers": []}
-            with open(DEFAULT_DATA_FILE, "w") as f:
-                json.dump(default_contents, f, indent=2)
-            return Config(config_path=DEFAULT_DATA_FILE, contents=default_contents)
-        else:
-            # Fall back to default if custom config failed
-            logger.info("Falling back to default config")
-            try:
-                with open(DEFAULT_DATA_FILE, "r") as f:
-                    contents = json.load(f)
-                    return Config(config_path=DEFAULT_DATA_FILE, contents=contents)
-            except (FileNotFoundError, IOError, json.JSONDecodeError):
-                # Create default if it doesn't exist or is corrupted
-                logger.info("Creating new default config file as fallback")
-                default_contents = {"tickers": []}
-                with open(DEFAULT_DATA_FILE, "w") as f:
-                    json.dump(default_contents, f, indent=2)
-                return Config(config_path=DEFAULT_DATA_FILE, contents=default_contents)
+        return _load_last_config_from(dir_fd)
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+
+
+def _load_last_config_from(dir_fd: Optional[int]) -> Config:
+    """Load the last used config, reading files in CONFIG_DIR via ``dir_fd``."""
+
+    # Try the config referenced by the last config file first
+    last_config_path = _read_last_config_reference(dir_fd)
+    if last_config_path is not None and last_config_path != DEFAULT_DATA_FILE:
+        contents = _read_config(last_config_path, dir_fd)
+        if contents is not None:
+            logger.info(f"Loaded last used config: {last_config_path}")
+            return Config(config_path=last_config_path, contents=contents)
+        logger.info("Falling back to default config")
+
+    contents = _read_config(DEFAULT_DATA_FILE, dir_fd)
+    if contents is not None:
+        return Config(config_path=DEFAULT_DATA_FILE, contents=contents)
+
+    # Create default if it doesn't exist or is corrupted
+    logger.info("Creating new default config file")
+    default_contents = {"tickers": []}
+    DEFAULT_DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(DEFAULT_DATA_FILE, "wb") as f:
+        f.write(_json_dumps(default_contents))
+    return Config(config_path=DEFAULT_DATA_FILE, contents=default_contents)
+
+
+# The config only changes through save_last_config, which clears this cache
+load_last_config = functools.lru_cache(maxsize=1)(_load_last_config_uncached)
 
 
 def create_default_config_if_not_exists() -> None:
     """Create a default data file if it doesn't exist."""
     if not DEFAULT_DATA_FILE.exists():
-        with open(DEFAULT_DATA_FILE, "w") as f:
-            json.dump({"tickers": []}, f, indent=2)
+        DEFAULT_DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(DEFAULT_DATA_FILE, "wb") as f:
+            f.write(_json_dumps({"tickers": []}))
         logger.info(f"Created default data file: {DEFAULT_DATA_FILE}")
 
 
+def load_ticker_names() -> Dict[str, str]:
+    """Load the cached ticker to company name mapping."""
+    try:
+        return _json_loads(_read_file(TICKER_NAMES_FILE))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Error reading ticker name cache: {e}, ignoring it")
+        return {}
+
+
+def save_ticker_names(ticker_names: Dict[str, str]) -> None:
+    """Save the ticker to company name mapping for later runs."""
+    TICKER_NAMES_FILE.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomic(TICKER_NAMES_FILE, _json_dumps(ticker_names))
+
+
 def setup_signal_handlers(config: Config) -> None:
     """Setup signal handlers for graceful shutdown."""
+    import signal
 
     def signal_handler(signum, frame):
         logger.info("Received interrupt signal, saving config...")
-        save_last_config(config.config_path)
+        save_last_config(config.config_path, config)
         logger.info(f"Config saved to {LAST_CONFIG_FILE}")
         sys.exit(0)
 
@@ -5,23 +5,57 @@ Test runner script for yf_api.py
 This script provides convenient commands for running different types of tests.
 """
 
+import os
 import subprocess
 import sys
 from pathlib import Path
 
 
-def run_command(command: list[str], description: str) -> bool:
-    """Run a command and return whether it succeeded."""
+PYTEST_PREFIX = ("uv", "run", "python", "-m", "pytest")
+
+
+def run_pytest_in_process(args: tuple[str, ...]) -> int | None:
+    """Run pytest in this interpreter, or return None if it isn't installed here."""
+    try:
+        import pytest
+    except ImportError:
+        return None
+
+    os.chdir(Path(__file__).parent)
+    return int(pytest.main(list(args)))
+
+
+def run_command(
+    command: tuple[str, ...], description: str, in_process: bool = True
+) -> bool:
+    """Run a command and return whether it succeeded.
+
+    pytest commands run in this interpreter instead of a new `uv run` process,
+    unless `in_process` is False. Any other command replaces this process via
+    os.execvp, since nothing is left to do once it finishes, and so only
+    returns if it could not be started.
+    """
     print(f"\n🧪 {description}")
     print(f"Command: {' '.join(command)}")
     print("-" * 50)
 
+    if in_process and command[: len(PYTEST_PREFIX)] == PYTEST_PREFIX:
+        exit_code = run_pytest_in_process(command[len(PYTEST_PREFIX) :])
+        if exit_code == 0:
+            print(f"✅ {description} - PASSED")
+            return True
+        if exit_code is not None:
+            print(f"❌ {description} - FAILED (exit code: {exit_code})")
+            return False
+
+    # Output still sitting in Python's buffers is lost when the process is replaced
+    sys.stdout.flush()
+    sys.stderr.flush()
     try:
-        subprocess.run(command, cwd=Path(__file__).parent, check=True)
-        print(f"✅ {description} - PASSED")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} - FAILED (exit code: {e.returncode})")
+        os.chdir(Path(__file__).parent)
+        os.execvp(command[0], command)
+    except OSError as e:
+        print(f"❌ {description} - FAILED ({e})")
         return False
 
 
@@ -38,21 +72,21 @@ def main():
         sys.exit(1)
 
     command = sys.argv[1]
-    base_cmd = ["uv", "run", "python", "-m", "pytest", "tests/"]
+    base_cmd = (*PYTEST_PREFIX, "tests/")
 
     success = True
 
     if command == "all":
-        success = run_command(base_cmd + ["-v"], "Running all tests")
+        success = run_command((*base_cmd, "-v"), "Running all tests")
 
     elif command == "unit":
         success = run_command(
-            base_cmd + ["-v", "-k", "not TestIntegration"], "Running unit tests only"
+            (*base_cmd, "-v", "-k", "not TestIntegration"), "Running unit tests only"
         )
 
     elif command == "slow":
         success = run_command(
-            base_cmd + ["-v", "-m", "slow"], "Running integration tests only"
+            (*base_cmd, "-v", "-m", "slow"), "Running integration tests only"
         )
 
     elif command == "coverage":
@@ -64,8 +98,9 @@ def main():
                 capture_output=True,
             )
             success = run_command(
-                base_cmd + ["--cov=yf_api", "--cov-report=term-missing", "-v"],
+                (*base_cmd, "--cov=yf_api", "--cov-report=term-missing", "-v"),
                 "Running tests with coverage",
+                in_process=False,
             )
         except subprocess.CalledProcessError:
             print("❌ Coverage not available. Install with: uv add coverage pytest-cov")
@@ -0,0 +1,79 @@
+import pytest
+from unittest.mock import patch
+
+from cache import TTLCache
+
+
+@pytest.fixture
+def ttl_cache(tmp_path):
+    """Create a cache backed by a temporary database."""
+    cache = TTLCache(tmp_path / "cache.sqlite3")
+    yield cache
+    cache.close()
+
+
+class TestTTLCache:
+    """Test the TTLCache class."""
+
+    def test_get_missing_key(self, ttl_cache):
+        """Test that unknown keys are a miss."""
+        assert ttl_cache.get("missing", max_age=60) is None
+
+    def test_set_and_get(self, ttl_cache):
+        """Test that stored values are returned while fresh."""
+        ttl_cache.set("name:AAPL", "Apple Inc.")
+        ttl_cache.set("returns:AAPL", {"ytd": 0.1, "one_month": None})
+
+        assert ttl_cache.get("name:AAPL", max_age=60) == "Apple Inc."
+        assert ttl_cache.get("returns:AAPL", max_age=60) == {
+            "ytd": 0.1,
+            "one_month": None,
+        }
+
+    def test_expired_entry_is_a_miss(self, ttl_cache):
+        """Test that entries older than max_age are ignored."""
+        with patch("cache.time.time", return_value=1000.0):
+            ttl_cache.set("price:AAPL", 150.25)
+
+        with patch("cache.time.time", return_value=1030.0):
+            assert ttl_cache.get("price:AAPL", max_age=60) == 150.25
+            assert ttl_cache.get("price:AAPL", max_age=10) is None
+
+    def test_set_overwrites(self, ttl_cache):
+        """Test that setting a key again replaces the value."""
+        ttl_cache.set("price:AAPL", 150.25)
+        ttl_cache.set("price:AAPL", 151.0)
+
+        assert ttl_cache.get("price:AAPL", max_age=60) == 151.0
+
+    def test_delete(self, ttl_cache):
+        """Test that deleted keys are a miss and unknown keys are ignored."""
+        ttl_cache.set("invalid:XYZ", True)
+
+        ttl_cache.delete("invalid:XYZ")
+        ttl_cache.delete("missing")
+
+        assert ttl_cache.get("invalid:XYZ", max_age=60) is None
+
+    def test_values_persist_across_instances(self, tmp_path):
+        """Test that a new cache on the same file sees earlier entries."""
+        path = tmp_path / "nested" / "cache.sqlite3"
+        first = TTLCache(path)
+        first.set("name:AAPL", "Apple Inc.")
+        first.close()
+
+        second = TTLCache(path)
+        try:
+            assert second.get("name:AAPL", max_age=60) == "Apple Inc."
+        finally:
+            second.close()
+
+    def test_unusable_path_is_a_miss(self, tmp_path):
+        """Test that database errors don't propagate."""
+        blocker = tmp_path / "not_a_dir"
+        blocker.write_text("")
+        cache = TTLCache(blocker / "cache.sqlite3")
+
+        cache.set("name:AAPL", "Apple Inc.")
+
+        assert cache.get("name:AAPL", max_age=60) is None
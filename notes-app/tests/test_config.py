@@ -1,4 +1,5 @@
 import json
+import os
 import tempfile
 import pytest
 from pathlib import Path
@@ -9,10 +10,15 @@ from config import (
     save_last_config,
     load_last_config,
     create_default_config_if_not_exists,
+    load_ticker_names,
+    save_ticker_names,
     setup_signal_handlers,
     CONFIG_DIR,
     LAST_CONFIG_FILE,
     DEFAULT_DATA_FILE,
+    _json_dumps,
+    _json_loads,
+    _read_config,
 )
 
 
@@ -23,10 +29,15 @@ def temp_config_dir():
         temp_dir = Path(tmpdir) / "test_config"
         temp_dir.mkdir(parents=True, exist_ok=True)
         
+        load_last_config.cache_clear()
         with patch('config.CONFIG_DIR', temp_dir), \
              patch('config.LAST_CONFIG_FILE', temp_dir / ".last_config"), \
-             patch('config.DEFAULT_DATA_FILE', temp_dir / "scn_data.json"):
+             patch('config.DEFAULT_DATA_FILE', temp_dir / "scn_data.json"), \
+             patch('config.TICKER_NAMES_FILE', temp_dir / ".ticker_names.json"), \
+             patch.dict('config._config_cache', clear=True), \
+             patch('config._last_saved', None):
             yield temp_dir
+        load_last_config.cache_clear()
 
 
 @pytest.fixture
@@ -46,6 +57,30 @@ class TestConfig:
         
         assert config.config_path == path
         assert config.contents == contents
+    
+    def test_config_has_no_instance_dict(self):
+        """Test that Config uses slots instead of a per-instance __dict__."""
+        config = Config(config_path=Path("/test/path.json"), contents={})
+        
+        assert not hasattr(config, "__dict__")
+
+
+class TestJsonHelpers:
+    """Test the JSON encode/decode helpers."""
+    
+    def test_json_round_trip(self, sample_config_content):
+        """Test that dumped bytes load back to the same contents."""
+        data = _json_dumps(sample_config_content)
+        
+        assert isinstance(data, bytes)
+        assert _json_loads(data) == sample_config_content
+    
+    def test_json_dumps_is_indented(self):
+        """Test that dumped config files stay human readable."""
+        data = _json_dumps({"tickers": ["AAPL"]})
+        
+        assert json.loads(data) == {"tickers": ["AAPL"]}
+        assert b"\n  " in data
 
 
 class TestSaveLastConfig:
@@ -64,6 +99,51 @@ class TestSaveLastConfig:
             saved_path = f.read().strip()
         assert saved_path == str(test_path.absolute())
     
+    def test_save_last_config_caches_absolute_path(self, temp_config_dir):
+        """Test that the absolute path is resolved once per config."""
+        test_path = temp_config_dir / "custom_config.json"
+        config = Config(config_path=test_path, contents={})
+        
+        save_last_config(test_path, config)
+        assert config.absolute_path == str(test_path.absolute())
+        
+        with patch.object(Path, 'absolute') as mock_absolute:
+            save_last_config(test_path, config)
+        mock_absolute.assert_not_called()
+        
+        with open(temp_config_dir / ".last_config", "r") as f:
+            assert f.read() == str(test_path.absolute())
+    
+    def test_save_last_config_other_path_ignores_cache(self, temp_config_dir):
+        """Test that a config loaded from another path doesn't decide what is saved."""
+        first_path = temp_config_dir / "a.json"
+        second_path = temp_config_dir / "b.json"
+        config = Config(config_path=first_path, contents={})
+        
+        save_last_config(first_path, config)
+        save_last_config(second_path, config)
+        
+        with open(temp_config_dir / ".last_config", "r") as f:
+            assert f.read() == str(second_path.absolute())
+        assert config.absolute_path == str(first_path.absolute())
+    
+    def test_save_last_config_leaves_no_temp_file(self, temp_config_dir):
+        """Test that the last config file is replaced atomically."""
+        save_last_config(temp_config_dir / "custom_config.json")
+        
+        assert sorted(p.name for p in temp_config_dir.iterdir()) == [".last_config"]
+    
+    def test_save_last_config_skips_identical_save(self, temp_config_dir):
+        """Test that saving the same path twice only writes once."""
+        test_path = temp_config_dir / "custom_config.json"
+        
+        save_last_config(test_path)
+        with patch('config._write_atomic') as mock_write:
+            save_last_config(test_path)
+            save_last_config(temp_config_dir / "other_config.json")
+        
+        mock_write.assert_called_once()
+    
     def test_save_last_config_creates_parent_dirs(self):
         """Test that save_last_config creates parent directories if needed."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -208,6 +288,121 @@ class TestLoadLastConfig:
         # Should fallback to default
         assert config.config_path == default_file
         assert config.contents == default_content
+    
+    def test_load_last_config_without_dir_fd(self, temp_config_dir, sample_config_content):
+        """Test loading config on platforms without fd-relative opens."""
+        default_file = temp_config_dir / "scn_data.json"
+        
+        with open(default_file, "w") as f:
+            json.dump(sample_config_content, f)
+        
+        with patch('config._open_config_dir', return_value=None):
+            config = load_last_config()
+        
+        assert config.config_path == default_file
+        assert config.contents == sample_config_content
+    
+    def test_load_last_config_is_cached(self, temp_config_dir, sample_config_content):
+        """Test that repeated loads reuse the parsed config."""
+        default_file = temp_config_dir / "scn_data.json"
+        
+        with open(default_file, "w") as f:
+            json.dump(sample_config_content, f)
+        
+        first = load_last_config()
+        default_file.unlink()
+        second = load_last_config()
+        
+        assert second is first
+    
+    def test_save_last_config_invalidates_cache(self, temp_config_dir, sample_config_content):
+        """Test that saving a new last config is picked up by the next load."""
+        default_file = temp_config_dir / "scn_data.json"
+        custom_config = temp_config_dir / "custom.json"
+        custom_content = {"tickers": ["TSLA"]}
+        
+        with open(default_file, "w") as f:
+            json.dump(sample_config_content, f)
+        with open(custom_config, "w") as f:
+            json.dump(custom_content, f)
+        
+        assert load_last_config().config_path == default_file
+        save_last_config(custom_config)
+        config = load_last_config()
+        
+        assert config.config_path == custom_config
+        assert config.contents == custom_content
+
+
+class TestReadConfig:
+    """Test the _read_config helper."""
+    
+    def test_read_config_missing_file(self, temp_config_dir):
+        """Test that a missing config file reads as None."""
+        assert _read_config(temp_config_dir / "missing.json") is None
+    
+    def test_read_config_corrupted_file(self, temp_config_dir):
+        """Test that an invalid config file reads as None."""
+        config_file = temp_config_dir / "corrupted.json"
+        config_file.write_text("{ invalid json }")
+        
+        assert _read_config(config_file) is None
+    
+    def test_read_config_reuses_parsed_contents(self, temp_config_dir, sample_config_content):
+        """Test that an unchanged file is only parsed once."""
+        config_file = temp_config_dir / "custom.json"
+        with open(config_file, "w") as f:
+            json.dump(sample_config_content, f)
+        
+        with patch('config._json_loads', wraps=_json_loads) as mock_loads:
+            first = _read_config(config_file)
+            second = _read_config(config_file)
+        
+        assert first == sample_config_content
+        assert second == first
+        assert mock_loads.call_count == 1
+    
+    def test_read_config_returns_copies(self, temp_config_dir, sample_config_content):
+        """Test that changing returned contents doesn't change the cached ones."""
+        config_file = temp_config_dir / "custom.json"
+        with open(config_file, "w") as f:
+            json.dump(sample_config_content, f)
+        
+        _read_config(config_file)["tickers"].append("CHANGED")
+        
+        assert _read_config(config_file) == sample_config_content
+    
+    def test_read_config_reparses_modified_file(self, temp_config_dir, sample_config_content):
+        """Test that a modified file is parsed again."""
+        config_file = temp_config_dir / "custom.json"
+        with open(config_file, "w") as f:
+            json.dump(sample_config_content, f)
+        assert _read_config(config_file) == sample_config_content
+        
+        stat = config_file.stat()
+        
+        # Rewritten within the same mtime tick
+        new_content = {"tickers": ["NEW"]}
+        with open(config_file, "w") as f:
+            json.dump(new_content, f)
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        
+        assert _read_config(config_file) == new_content
+    
+    def test_read_config_reparses_replaced_file(self, temp_config_dir):
+        """Test that a same-size file replaced within one mtime tick is parsed again."""
+        config_file = temp_config_dir / "custom.json"
+        config_file.write_text('{"tickers": ["OLD"]}')
+        assert _read_config(config_file) == {"tickers": ["OLD"]}
+        stat = config_file.stat()
+        
+        tmp_file = temp_config_dir / "custom.json.tmp"
+        tmp_file.write_text('{"tickers": ["NEW"]}')
+        os.utime(tmp_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_file, config_file)
+        
+        assert config_file.stat().st_size == stat.st_size
+        assert _read_config(config_file) == {"tickers": ["NEW"]}
 
 
 class TestCreateDefaultConfig:
@@ -225,6 +420,15 @@ class TestCreateDefaultConfig:
             contents = json.load(f)
         assert contents == {"tickers": []}
     
+    def test_create_default_config_creates_parent_dirs(self, temp_config_dir):
+        """Test that the config directory is created on demand."""
+        default_file = temp_config_dir / "nested" / "scn_data.json"
+        
+        with patch('config.DEFAULT_DATA_FILE', default_file):
+            create_default_config_if_not_exists()
+        
+        assert default_file.exists()
+    
     def test_create_default_config_existing_file(self, temp_config_dir):
         """Test that existing config file is not overwritten."""
         default_file = temp_config_dir / "scn_data.json"
@@ -243,10 +447,33 @@ class TestCreateDefaultConfig:
         assert contents == existing_content
 
 
+class TestTickerNames:
+    """Test the ticker name cache helpers."""
+    
+    def test_load_ticker_names_missing_file(self, temp_config_dir):
+        """Test that a missing cache file loads as an empty mapping."""
+        assert load_ticker_names() == {}
+    
+    def test_ticker_names_round_trip(self, temp_config_dir):
+        """Test that saved ticker names are loaded back."""
+        names = {"AAPL": "Apple Inc.", "MSFT": "Microsoft Corporation"}
+        
+        save_ticker_names(names)
+        
+        assert (temp_config_dir / ".ticker_names.json").exists()
+        assert load_ticker_names() == names
+    
+    def test_load_ticker_names_corrupted_file(self, temp_config_dir):
+        """Test that a corrupted cache file is ignored."""
+        (temp_config_dir / ".ticker_names.json").write_text("{ invalid json }")
+        
+        assert load_ticker_names() == {}
+
+
 class TestSignalHandlers:
     """Test the setup_signal_handlers function."""
     
-    @patch('config.signal.signal')
+    @patch('signal.signal')
     def test_setup_signal_handlers(self, mock_signal):
         """Test that signal handlers are properly registered."""
         config = Config(config_path=Path("/test/path.json"), contents={})
@@ -265,7 +492,7 @@ class TestSignalHandlers:
     
     @patch('config.sys.exit')
     @patch('config.save_last_config')
-    @patch('config.signal.signal')
+    @patch('signal.signal')
     def test_signal_handler_execution(self, mock_signal, mock_save, mock_exit):
         """Test that signal handler saves config and exits."""
         config = Config(config_path=Path("/test/path.json"), contents={})
@@ -279,5 +506,5 @@ class TestSignalHandlers:
         signal_handler(None, None)
         
         # Verify config was saved and program exited
-        mock_save.assert_called_once_with(config.config_path)
+        mock_save.assert_called_once_with(config.config_path, config)
         mock_exit.assert_called_once_with(0)
\ No newline at end of file
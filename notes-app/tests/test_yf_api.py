@@ -1,14 +1,82 @@
+import asyncio
+import logging
+import subprocess
+import sys
+import threading
+import time
 import pytest
-from unittest.mock import Mock, patch
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from unittest.mock import ANY, Mock, patch
+import numpy as np
 import pandas as pd
+import yfinance as yf
+from pathlib import Path
+from yfinance.exceptions import YFPricesMissingError, YFRateLimitError
+from cache import TTLCache
 from yf_api import (
     Market,
+    RATE_LIMIT_DELAY,
+    RETRY_BASE_DELAY,
     get_company_name_from_ticker,
+    get_company_name_from_ticker_async,
+    get_company_names_from_tickers,
     get_current_stock_price,
+    get_current_stock_price_async,
     get_historical_returns,
+    get_historical_returns_async,
+    get_historical_returns_batch,
+    _history_start,
+    _returns_from_close_matrix,
+    _returns_from_closes,
+    _with_retry,
+    warm_cache,
 )
 
 
+@pytest.fixture(autouse=True)
+def yf_cache(tmp_path):
+    """Give every test an empty response cache instead of the user's one."""
+    cache = TTLCache(tmp_path / "yf_cache.sqlite3")
+    with patch("yf_api._cache", cache):
+        yield cache
+    cache.close()
+
+
+@pytest.fixture(autouse=True)
+def without_yfinance_cache():
+    """Run against plain yfinance even if yfinance-cache is installed."""
+    with patch("yf_api.yfc", None):
+        yield
+
+
+class TestLazyImports:
+    """Test that importing yf_api leaves the heavy dependencies unloaded."""
+
+    def test_import_skips_yfinance_and_pandas(self):
+        """Test that yfinance and pandas are only imported on first use."""
+        code = (
+            "import sys, yf_api; "
+            "print(any(m in sys.modules for m in ('yfinance', 'pandas', 'curl_cffi')))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        assert result.stdout.strip() == "False"
+
+    def test_module_attributes_resolve(self):
+        """Test that yf_api.yf and yf_api.pd still give the modules."""
+        import yf_api
+
+        assert yf_api.yf is yf
+        assert yf_api.pd is pd
+
+
 class TestMarket:
     """Test the Market enum."""
 
@@ -34,41 +102,58 @@ class TestGetCompanyNameFromTicker:
         result = get_company_name_from_ticker("AAPL")
 
         assert result == "Apple Inc."
-        mock_ticker_class.assert_called_with("AAPL.ST")
+        mock_ticker_class.assert_any_call("AAPL.ST", session=ANY)
 
     @patch("yf_api.yf.Ticker")
-    def test_get_company_name_success_second_market(self, mock_ticker_class):
+    def test_get_company_name_success_second_market(
+        self, mock_ticker_class, mock_ticker_factory
+    ):
         """Test successful retrieval of company name from second market after first fails."""
-        # Setup mock to fail on first call, succeed on second
-        mock_ticker1 = Mock()
-        mock_ticker1.info = {"longName": None}
+        # Setup mock to fail on the first market, succeed on the second
+        names = {"AAPL.ST": None, "AAPL": "Apple Inc."}
+        mock_ticker_class.side_effect = lambda symbol, session=None: (
+            mock_ticker_factory({"longName": names.get(symbol)})
+        )
 
-        mock_ticker2 = Mock()
-        mock_ticker2.info = {"longName": "Apple Inc."}
+        result = get_company_name_from_ticker("AAPL")
 
-        mock_ticker_class.side_effect = [mock_ticker1, mock_ticker2]
+        assert result == "Apple Inc."
+        mock_ticker_class.assert_any_call("AAPL.ST", session=ANY)
+        mock_ticker_class.assert_any_call("AAPL", session=ANY)
+
+    @patch("yf_api.yf.Ticker")
+    def test_get_company_name_prefers_earlier_market(
+        self, mock_ticker_class, mock_ticker_factory
+    ):
+        """Test that an earlier market wins even if a later one answers first."""
+
+        def create_ticker(symbol, session=None):
+            if symbol == "AAPL.ST":
+                time.sleep(0.05)
+            return mock_ticker_factory({"longName": f"Name for {symbol}"})
+
+        mock_ticker_class.side_effect = create_ticker
 
         result = get_company_name_from_ticker("AAPL")
 
-        assert result == "Apple Inc."
-        assert mock_ticker_class.call_count == 2
+        assert result == "Name for AAPL.ST"
 
     @patch("yf_api.yf.Ticker")
-    def test_get_company_name_value_error(self, mock_ticker_class):
+    def test_get_company_name_value_error(self, mock_ticker_class, mock_ticker_factory):
         """Test handling of ValueError during ticker creation."""
-        # Setup mock to raise ValueError then succeed
-        mock_ticker_success = Mock()
-        mock_ticker_success.info = {"longName": "Apple Inc."}
 
-        mock_ticker_class.side_effect = [
-            ValueError("Invalid ticker"),
-            mock_ticker_success,
-        ]
+        # Setup mock to raise ValueError on the first market, succeed on the second
+        def create_ticker(symbol, session=None):
+            if symbol == "AAPL.ST":
+                raise ValueError("Invalid ticker")
+            return mock_ticker_factory({"longName": "Apple Inc."})
+
+        mock_ticker_class.side_effect = create_ticker
 
         result = get_company_name_from_ticker("AAPL")
 
         assert result == "Apple Inc."
-        assert mock_ticker_class.call_count == 2
+        mock_ticker_class.assert_any_call("AAPL", session=ANY)
 
     @patch("yf_api.yf.Ticker")
     def test_get_company_name_not_found(self, mock_ticker_class):
@@ -102,7 +187,477 @@ class TestGetCompanyNameFromTicker:
 
             get_company_name_from_ticker("aapl")
 
-            mock_ticker_class.assert_called_with("AAPL.ST")
+            mock_ticker_class.assert_any_call("AAPL.ST", session=ANY)
+
+    @patch("yf_api.yf.Ticker")
+    def test_get_company_name_probes_logged_not_printed(
+        self, mock_ticker_class, mock_ticker_factory, capsys, caplog
+    ):
+        """Test that probed symbols go to the debug log instead of stdout."""
+        mock_ticker_class.return_value = mock_ticker_factory({"longName": "Ericsson"})
+
+        with caplog.at_level(logging.DEBUG, logger="notes_app.yf_api"):
+            get_company_name_from_ticker("ERIC-B")
+
+        assert capsys.readouterr().out == ""
+        assert "Probing ERIC-B.ST" in caplog.messages
+
+
+class TestYfinanceCache:
+    """Test that yfinance-cache is used when it is installed."""
+
+    @patch("yf_api.yf.Ticker")
+    def test_info_and_history_use_yfinance_cache(
+        self, mock_ticker_class, sample_historical_data
+    ):
+        """Test that names and returns come from yfinance-cache tickers."""
+        mock_yfc = Mock()
+        mock_yfc.Ticker.return_value.info = {"longName": "Apple Inc."}
+        mock_yfc.Ticker.return_value.history.return_value = sample_historical_data
+
+        with patch("yf_api.yfc", mock_yfc):
+            assert get_company_name_from_ticker("AAPL") == "Apple Inc."
+            assert get_historical_returns("AAPL")["ytd"] is not None
+
+        mock_yfc.Ticker.assert_any_call("AAPL.ST", session=ANY)
+        mock_yfc.Ticker.assert_any_call("AAPL", session=ANY)
+        mock_ticker_class.assert_not_called()
+
+    @patch("yf_api.yf.Ticker")
+    def test_price_bypasses_yfinance_cache(self, mock_ticker_class):
+        """Test that prices still come from yfinance."""
+        mock_ticker_class.return_value.fast_info = {"last_price": 150.25}
+        mock_yfc = Mock()
+
+        with patch("yf_api.yfc", mock_yfc):
+            assert get_current_stock_price("AAPL") == 150.25
+
+        mock_yfc.Ticker.assert_not_called()
+
+
+class TestYfinanceLogging:
+    """Test which yfinance log records are let through."""
+
+    def test_quote_not_found_dropped(self, caplog):
+        """Test that expected 404s from market probes aren't logged."""
+        with caplog.at_level(logging.ERROR, logger="yfinance"):
+            logging.getLogger("yfinance").error("HTTP Error 404: Not Found")
+
+        assert caplog.records == []
+
+    def test_other_errors_logged(self, caplog):
+        """Test that other yfinance errors still get through."""
+        with caplog.at_level(logging.ERROR, logger="yfinance"):
+            logging.getLogger("yfinance").error("HTTP Error 500: Server Error")
+            logging.getLogger("yfinance").error("AAPL: possibly delisted")
+
+        assert caplog.messages == [
+            "HTTP Error 500: Server Error",
+            "AAPL: possibly delisted",
+        ]
+
+
+class TestResponseCache:
+    """Test that Yahoo Finance responses are served from the cache."""
+
+    @patch("yf_api.yf.Ticker")
+    def test_company_name_cached(self, mock_ticker_class):
+        """Test that a resolved name is not fetched again."""
+        mock_ticker = Mock()
+        mock_ticker.info = {"longName": "Apple Inc."}
+        mock_ticker_class.return_value = mock_ticker
+
+        assert get_company_name_from_ticker("AAPL") == "Apple Inc."
+        fetches = mock_ticker_class.call_count
+        assert get_company_name_from_ticker("aapl") == "Apple Inc."
+
+        assert mock_ticker_class.call_count == fetches
+
+    @patch("yf_api.yf.Ticker")
+    def test_company_name_uses_known_market(self, mock_ticker_class, yf_cache):
+        """Test that a ticker's known market is served without any probing."""
+        yf_cache.set("market:AAPL", Market.USA.value)
+        yf_cache.set("name:AAPL", "Apple Inc.")
+
+        assert get_company_name_from_ticker("AAPL") == "Apple Inc."
+        mock_ticker_class.assert_not_called()
+
+    @patch("yf_api.yf.Ticker")
+    def test_company_name_probes_known_market_first(self, mock_ticker_class, yf_cache):
+        """Test that an expired name is refetched from the known market first."""
+        yf_cache.set("market:ENI", Market.ITA.value)
+        mock_ticker = Mock()
+        mock_ticker.info = {"longName": "Eni S.p.A."}
+        mock_ticker_class.return_value = mock_ticker
+
+        assert get_company_name_from_ticker("ENI") == "Eni S.p.A."
+        mock_ticker_class.assert_called_once_with("ENI.MI", session=ANY)
+
+    @patch("yf_api.yf.Ticker")
+    def test_company_name_learns_market(self, mock_ticker_class, yf_cache):
+        """Test that the market a name was found on is remembered."""
+        names = {"ENI.MI": "Eni S.p.A."}
+
+        def create_ticker(symbol, session=None):
+            mock_ticker = Mock()
+            mock_ticker.info = {"longName": names.get(symbol)}
+            return mock_ticker
+
+        mock_ticker_class.side_effect = create_ticker
+
+        assert get_company_name_from_ticker("ENI") == "Eni S.p.A."
+        assert yf_cache.get("market:ENI", max_age=60) == Market.ITA.value
+
+    @patch("yf_api.yf.Ticker")
+    def test_company_name_force_refresh(self, mock_ticker_class, yf_cache):
+        """Test that force_refresh bypasses the cached name."""
+        yf_cache.set("market:AAPL", Market.STO.value)
+        yf_cache.set("name:AAPL.ST", "Stale Name")
+        mock_ticker = Mock()
+        mock_ticker.info = {"longName": "Apple Inc."}
+        mock_ticker_class.return_value = mock_ticker
+
+        assert get_company_name_from_ticker("AAPL", force_refresh=True) == "Apple Inc."
+        assert get_company_name_from_ticker("AAPL") == "Apple Inc."
+
+    @patch("yf_api.yf.Ticker")
+    def test_not_found_is_cached(self, mock_ticker_class, yf_cache):
+        """Test that a failed name lookup isn't retried until it expires."""
+        mock_ticker = Mock()
+        mock_ticker.info = {"longName": None}
+        mock_ticker_class.return_value = mock_ticker
+
+        assert get_company_name_from_ticker("INVALID") is None
+        assert get_company_name_from_ticker("INVALID") is None
+        assert mock_ticker_class.call_count == len(Market)
+
+        assert get_company_name_from_ticker("INVALID", force_refresh=True) is None
+        assert mock_ticker_class.call_count == 2 * len(Market)
+
+    @patch("yf_api.yf.Ticker")
+    def test_forced_hit_clears_not_found(self, mock_ticker_class, yf_cache):
+        """Test that a name found by a forced refresh replaces a cached miss."""
+        mock_ticker = Mock()
+        mock_ticker.info = {"longName": None}
+        mock_ticker_class.return_value = mock_ticker
+        assert get_company_name_from_ticker("XYZ") is None
+
+        mock_ticker.info = {"longName": "Xyz Corp"}
+        assert get_company_name_from_ticker("XYZ", force_refresh=True) == "Xyz Corp"
+
+        assert get_company_name_from_ticker("XYZ") == "Xyz Corp"
+
+    @patch("yf_api.yf.Ticker")
+    def test_current_price_cached(self, mock_ticker_class):
+        """Test that the current price is not fetched again while fresh."""
+        mock_ticker = Mock()
+        mock_ticker.fast_info = {"last_price": 150.25}
+        mock_ticker_class.return_value = mock_ticker
+
+        assert get_current_stock_price("AAPL") == 150.25
+        assert get_current_stock_price("AAPL") == 150.25
+        assert get_current_stock_price("AAPL", force_refresh=True) == 150.25
+
+        assert mock_ticker_class.call_count == 2
+
+    @patch("yf_api.yf.Ticker")
+    def test_current_price_cache_ignores_case(self, mock_ticker_class):
+        """Test that "aapl" and "AAPL" share one cached price."""
+        mock_ticker_class.return_value.fast_info = {"last_price": 150.25}
+
+        assert get_current_stock_price("aapl") == 150.25
+        assert get_current_stock_price("AAPL") == 150.25
+
+        mock_ticker_class.assert_called_once_with("AAPL", session=ANY)
+
+    @patch("yf_api.yf.Ticker")
+    def test_historical_returns_cached(self, mock_ticker_class):
+        """Test that computed returns are not fetched again while fresh."""
+        dates = pd.date_range(start="2024-01-01", periods=2, freq="D")
+        mock_data = pd.DataFrame({"Close": pd.Series([100.0, 110.0], index=dates)})
+        mock_ticker = Mock()
+        mock_ticker.history.return_value = mock_data
+        mock_ticker_class.return_value = mock_ticker
+
+        first = get_historical_returns("AAPL")
+        second = get_historical_returns("AAPL")
+
+        assert second == first
+        assert abs(second["ytd"] - 0.10) < 0.0001
+        assert mock_ticker.history.call_count == 1
+
+
+class TestFetchGuards:
+    """Test that concurrent requests for the same data share one fetch."""
+
+    @patch("yf_api.yf.Ticker")
+    def test_concurrent_name_lookups_fetch_once(
+        self, mock_ticker_class, mock_ticker_factory
+    ):
+        """Test that a second caller waits for the first lookup's result."""
+
+        def create_ticker(symbol, session=None):
+            time.sleep(0.05)
+            return mock_ticker_factory({"longName": "Apple Inc."})
+
+        mock_ticker_class.side_effect = create_ticker
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(get_company_name_from_ticker, ["AAPL", "aapl"]))
+
+        assert results == ["Apple Inc.", "Apple Inc."]
+        calls = [call.args[0] for call in mock_ticker_class.call_args_list]
+        assert calls.count("AAPL.ST") == 1
+
+    @patch("yf_api.yf.Ticker")
+    def test_concurrent_price_lookups_fetch_once(self, mock_ticker_class):
+        """Test that concurrent price requests share one fetch."""
+
+        def create_ticker(symbol, session=None):
+            time.sleep(0.05)
+            mock_ticker = Mock()
+            mock_ticker.fast_info = {"last_price": 150.25}
+            return mock_ticker
+
+        mock_ticker_class.side_effect = create_ticker
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(get_current_stock_price, ["AAPL"] * 3))
+
+        assert results == [150.25] * 3
+        assert mock_ticker_class.call_count == 1
+
+
+class FetchOnceTicker:
+    """Stand-in for yf.Ticker that, like yfinance, fetches info only once.
+
+    yfinance marks info as fetched before requesting it, so after a failed
+    request later accesses return None instead of trying again.
+    """
+
+    def __init__(self, info=None, fast_info=None, error=None):
+        self._info = info if info is not None else {}
+        self._fast_info = fast_info
+        self._error = error
+        self._fetched = False
+
+    def _fetch(self, value):
+        if self._fetched:
+            return None
+        self._fetched = True
+        if self._error is not None:
+            raise self._error
+        return value
+
+    @property
+    def info(self):
+        return self._fetch(self._info)
+
+    @property
+    def fast_info(self):
+        return self._fetch(self._fast_info)
+
+
+class TestRetry:
+    """Test retrying transient Yahoo Finance failures."""
+
+    @patch("yf_api.time.sleep")
+    def test_retries_with_backoff(self, mock_sleep):
+        """Test that failures are retried with growing delays."""
+        fn = Mock(side_effect=[ConnectionError(), ConnectionError(), "ok"])
+
+        assert _with_retry(fn) == "ok"
+        assert fn.call_count == 3
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [
+            pytest.approx(0.3),
+            pytest.approx(0.9),
+        ]
+
+    @patch("yf_api.time.sleep")
+    def test_gives_up_after_attempts(self, mock_sleep):
+        """Test that the last failure is raised once attempts run out."""
+        fn = Mock(side_effect=ConnectionError("down"))
+
+        with pytest.raises(ConnectionError):
+            _with_retry(fn, attempts=3)
+        assert fn.call_count == 3
+        assert mock_sleep.call_count == 2
+
+    def test_stop_ends_the_wait(self):
+        """Test that setting stop re-raises instead of retrying."""
+        stop = threading.Event()
+
+        def fail():
+            stop.set()
+            raise ConnectionError("down")
+
+        fn = Mock(side_effect=fail)
+
+        with pytest.raises(ConnectionError):
+            _with_retry(fn, base=60.0, stop=stop)
+        assert fn.call_count == 1
+
+    @patch("yf_api.yf.Ticker")
+    def test_leftover_probes_stop_retrying(self, mock_ticker_class):
+        """Test that probes still failing after a name is found aren't retried."""
+        calls = []
+
+        def create_ticker(symbol, session=None):
+            calls.append(symbol)
+            if symbol == "AAPL.ST":
+                return FetchOnceTicker(info={"longName": "Apple Inc."})
+            return FetchOnceTicker(error=ConnectionError())
+
+        mock_ticker_class.side_effect = create_ticker
+
+        assert get_company_name_from_ticker("AAPL") == "Apple Inc."
+        # Unstopped probes would retry after RETRY_BASE_DELAY
+        time.sleep(RETRY_BASE_DELAY + 0.2)
+        assert len(calls) == len(set(calls))
+
+    @patch("yf_api.time.sleep")
+    def test_rate_limit_waits_longer(self, mock_sleep):
+        """Test that a rate limit answer uses the longer delay."""
+        fn = Mock(side_effect=[YFRateLimitError(), "ok"])
+
+        assert _with_retry(fn) == "ok"
+        mock_sleep.assert_called_once_with(RATE_LIMIT_DELAY)
+
+    @patch("yf_api.time.sleep")
+    def test_other_errors_not_retried(self, mock_sleep):
+        """Test that errors that aren't transient propagate immediately."""
+        fn = Mock(side_effect=KeyError("longName"))
+
+        with pytest.raises(KeyError):
+            _with_retry(fn)
+        assert fn.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch("yf_api.time.sleep")
+    @patch("yf_api.yf.Ticker")
+    def test_name_survives_transient_failure(self, mock_ticker_class, mock_sleep):
+        """Test that a network blip while probing doesn't lose the name."""
+        attempts = {
+            "AAPL.ST": [
+                FetchOnceTicker(error=ConnectionError()),
+                FetchOnceTicker(info={"longName": "Apple Inc."}),
+            ]
+        }
+        mock_ticker_class.side_effect = lambda symbol, session=None: (
+            attempts[symbol].pop(0) if symbol in attempts else FetchOnceTicker()
+        )
+
+        assert get_company_name_from_ticker("AAPL") == "Apple Inc."
+
+    @patch("yf_api.time.sleep")
+    @patch("yf_api.yf.Ticker")
+    def test_price_survives_transient_failure(self, mock_ticker_class, mock_sleep):
+        """Test that a network blip doesn't lose the price."""
+        mock_ticker_class.side_effect = [
+            FetchOnceTicker(error=ConnectionError()),
+            FetchOnceTicker(fast_info={"last_price": 150.25}),
+        ]
+
+        assert get_current_stock_price("AAPL") == 150.25
+        assert mock_ticker_class.call_count == 2
+        mock_sleep.assert_called_once()
+
+    @patch("yf_api.time.sleep")
+    @patch("yf_api.yf.Ticker")
+    def test_history_survives_transient_failure(
+        self, mock_ticker_class, mock_sleep, sample_historical_data
+    ):
+        """Test that history errors are raised to the retry and retried."""
+        failing = Mock()
+        failing.history.side_effect = ConnectionError()
+        working = Mock()
+        working.history.return_value = sample_historical_data
+        mock_ticker_class.side_effect = [failing, working]
+
+        assert get_historical_returns("AAPL")["ytd"] is not None
+        assert failing.history.call_args.kwargs["raise_errors"] is True
+
+    @patch("yf_api.time.sleep")
+    @patch("yf_api.yf.Ticker")
+    def test_history_failure_gives_no_returns(
+        self, mock_ticker_class, mock_sleep, caplog
+    ):
+        """Test that history errors, once retries run out, give empty returns."""
+        mock_ticker_class.return_value.history.side_effect = RuntimeError(
+            "Yahoo Finance is down"
+        )
+
+        assert get_historical_returns("AAPL") == {"one_month": None, "ytd": None}
+        assert "Error fetching history for AAPL: Yahoo Finance is down" in (
+            caplog.messages
+        )
+
+    @patch("yf_api.time.sleep")
+    @patch("yf_api.yf.Ticker")
+    @patch("yf_api.yf.download")
+    def test_history_failure_keeps_batch(
+        self, mock_download, mock_ticker_class, mock_sleep
+    ):
+        """Test that one failing fallback fetch doesn't lose the batch."""
+        dates = pd.to_datetime(["2024-01-02", "2024-01-03"])
+        mock_download.return_value = make_download_frame(
+            {"AAPL": pd.Series([100.0, 110.0], index=dates)}
+        )
+        mock_ticker_class.return_value.history.side_effect = ConnectionError("down")
+
+        result = get_historical_returns_batch(["AAPL", "BROKEN"])
+
+        assert abs(result["AAPL"]["ytd"] - 0.10) < 0.0001
+        assert result["BROKEN"] == {"one_month": None, "ytd": None}
+
+    @patch("yf_api.yf.Ticker")
+    def test_history_missing_ticker(self, mock_ticker_class):
+        """Test that a ticker without prices gives no returns."""
+        mock_ticker_class.return_value.history.side_effect = YFPricesMissingError(
+            "XYZ", ""
+        )
+
+        assert get_historical_returns("XYZ") == {"one_month": None, "ytd": None}
+
+
+class TestGetCompanyNamesFromTickers:
+    """Test the get_company_names_from_tickers function."""
+
+    @patch("yf_api.yf.Ticker")
+    def test_get_company_names_preserves_order(self, mock_ticker_class):
+        """Test that names are returned in the order of the input tickers."""
+        names = {"AAPL.ST": "Apple Inc.", "MSFT.ST": "Microsoft Corporation"}
+
+        def create_ticker(symbol, session=None):
+            mock_ticker = Mock()
+            mock_ticker.info = {"longName": names.get(symbol)}
+            return mock_ticker
+
+        mock_ticker_class.side_effect = create_ticker
+
+        result = get_company_names_from_tickers(["MSFT", "INVALID", "AAPL"])
+
+        assert result == ["Microsoft Corporation", None, "Apple Inc."]
+
+    @patch("yf_api.yf.Ticker")
+    def test_get_company_names_duplicates_fetched_once(self, mock_ticker_class):
+        """Test that repeated tickers only trigger one lookup."""
+        mock_ticker = Mock()
+        mock_ticker.info = {"longName": "Apple Inc."}
+        mock_ticker_class.return_value = mock_ticker
+
+        result = get_company_names_from_tickers(["AAPL", "aapl", "AAPL"])
+
+        assert result == ["Apple Inc.", "Apple Inc.", "Apple Inc."]
+        # One fanout, each market probed at most once
+        calls = [call.args[0] for call in mock_ticker_class.call_args_list]
+        assert len(calls) == len(set(calls))
+
+    @patch("yf_api.yf.Ticker")
+    def test_get_company_names_empty_list(self, mock_ticker_class):
+        """Test that an empty ticker list makes no calls."""
+        assert get_company_names_from_tickers([]) == []
+        mock_ticker_class.assert_not_called()
 
 
 class TestGetCurrentStockPrice:
@@ -112,31 +667,42 @@ class TestGetCurrentStockPrice:
     def test_get_current_stock_price_success(self, mock_ticker_class):
         """Test successful retrieval of current stock price."""
         mock_ticker = Mock()
-        mock_ticker.info = {"currentPrice": 150.25}
+        mock_ticker.fast_info = {"last_price": 150.25}
         mock_ticker_class.return_value = mock_ticker
 
         result = get_current_stock_price("AAPL")
 
         assert result == 150.25
-        mock_ticker_class.assert_called_with("AAPL")
+        mock_ticker_class.assert_called_with("AAPL", session=ANY)
 
     @patch("yf_api.yf.Ticker")
     def test_get_current_stock_price_not_found(self, mock_ticker_class):
         """Test when current price is not available."""
         mock_ticker = Mock()
-        mock_ticker.info = {}
+        mock_ticker.fast_info = {}
         mock_ticker_class.return_value = mock_ticker
 
         result = get_current_stock_price("INVALID")
 
         assert result is None
-        mock_ticker_class.assert_called_with("INVALID")
+        mock_ticker_class.assert_called_with("INVALID", session=ANY)
 
     @patch("yf_api.yf.Ticker")
     def test_get_current_stock_price_none_value(self, mock_ticker_class):
         """Test when current price is explicitly None."""
         mock_ticker = Mock()
-        mock_ticker.info = {"currentPrice": None}
+        mock_ticker.fast_info = {"last_price": None}
+        mock_ticker_class.return_value = mock_ticker
+
+        result = get_current_stock_price("TEST")
+
+        assert result is None
+
+    @patch("yf_api.yf.Ticker")
+    def test_get_current_stock_price_nan_value(self, mock_ticker_class):
+        """Test when the current price is missing from the price history."""
+        mock_ticker = Mock()
+        mock_ticker.fast_info = {"last_price": float("nan")}
         mock_ticker_class.return_value = mock_ticker
 
         result = get_current_stock_price("TEST")
@@ -150,23 +716,14 @@ class TestGetHistoricalReturns:
     @patch("yf_api.yf.Ticker")
     def test_get_historical_returns_success(self, mock_ticker_class):
         """Test successful retrieval of historical returns."""
-        # Create mock YTD data
-        ytd_dates = pd.date_range(start="2024-01-01", end="2024-12-31", freq="D")
-        ytd_close_prices = pd.Series(
-            [100.0, 101.0, 102.0, 103.0, 110.0], index=ytd_dates[:5]
-        )
-
-        # Create mock 1-month data
-        one_month_dates = pd.date_range(start="2024-12-01", end="2024-12-31", freq="D")
-        one_month_close_prices = pd.Series(
-            [105.0, 106.0, 107.0, 108.0, 110.0], index=one_month_dates[:5]
+        # Create mock data, the last month starts on 2024-02-15
+        dates = pd.to_datetime(
+            ["2024-01-02", "2024-02-01", "2024-02-15", "2024-03-01", "2024-03-15"]
         )
-
-        mock_ytd_data = pd.DataFrame({"Close": ytd_close_prices})
-        mock_one_month_data = pd.DataFrame({"Close": one_month_close_prices})
+        close_prices = pd.Series([100.0, 101.0, 105.0, 108.0, 110.0], index=dates)
 
         mock_ticker = Mock()
-        mock_ticker.history.side_effect = [mock_ytd_data, mock_one_month_data]
+        mock_ticker.history.return_value = pd.DataFrame({"Close": close_prices})
         mock_ticker_class.return_value = mock_ticker
 
         result = get_historical_returns("AAPL")
@@ -178,10 +735,24 @@ class TestGetHistoricalReturns:
         assert result["one_month"] is not None
         assert abs(result["one_month"] - (5.0 / 105.0)) < 0.0001
 
-        # Verify correct calls were made
-        assert mock_ticker.history.call_count == 2
-        mock_ticker.history.assert_any_call(period="ytd", interval="1d")
-        mock_ticker.history.assert_any_call(period="1mo", interval="1d")
+        # Both returns come from a single request
+        assert mock_ticker.history.call_count == 1
+
+    @patch("yf_api.yf.Ticker")
+    def test_get_historical_returns_early_january(self, mock_ticker_class):
+        """Test that the 1-month window can reach into the previous year."""
+        dates = pd.to_datetime(["2023-12-11", "2023-12-29", "2024-01-02", "2024-01-10"])
+        close_prices = pd.Series([100.0, 104.0, 105.0, 110.0], index=dates)
+
+        mock_ticker = Mock()
+        mock_ticker.history.return_value = pd.DataFrame({"Close": close_prices})
+        mock_ticker_class.return_value = mock_ticker
+
+        result = get_historical_returns("AAPL")
+
+        # YTD return: (110 - 105) / 105, 1-month return: (110 - 100) / 100
+        assert abs(result["ytd"] - (5.0 / 105.0)) < 0.0001
+        assert abs(result["one_month"] - 0.10) < 0.0001
 
     @patch("yf_api.yf.Ticker")
     def test_get_historical_returns_empty_data(self, mock_ticker_class):
@@ -228,12 +799,248 @@ class TestGetHistoricalReturns:
         mock_ticker.history.return_value = mock_historical_data
         mock_ticker_class.return_value = mock_ticker
 
-        get_historical_returns("AAPL")
+        with patch("yf_api.date") as mock_date:
+            mock_date.today.return_value = date(2024, 6, 15)
+            mock_date.side_effect = date
+            get_historical_returns("AAPL")
+
+        # Should call history once, from the start of the year
+        mock_ticker.history.assert_called_once_with(
+            start=date(2024, 1, 1), interval="1d", actions=False, raise_errors=True
+        )
+
+    def test_history_start(self):
+        """Test that history starts at the earlier of Jan 1 and a month ago."""
+        assert _history_start(date(2024, 6, 15)) == date(2024, 1, 1)
+        assert _history_start(date(2024, 1, 10)) == date(2023, 12, 10)
+
+
+def make_download_frame(closes_by_ticker):
+    """Build a frame shaped like yf.download(..., group_by="ticker") output."""
+    frames = {
+        ticker: pd.DataFrame({"Close": closes})
+        for ticker, closes in closes_by_ticker.items()
+    }
+    return pd.concat(frames, axis=1)
+
+
+class TestGetHistoricalReturnsBatch:
+    """Test the get_historical_returns_batch function."""
+
+    @patch("yf_api.yf.download")
+    def test_batch_returns_success(self, mock_download):
+        """Test that returns are computed per ticker from a single download."""
+        dates = pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"])
+        mock_download.return_value = make_download_frame(
+            {
+                "AAPL": pd.Series([100.0, 105.0, 110.0], index=dates),
+                # Missing first day, as when markets have different holidays
+                "ERIC-B.ST": pd.Series([float("nan"), 50.0, 55.0], index=dates),
+            }
+        )
+
+        result = get_historical_returns_batch(["AAPL", "ERIC-B.ST"])
+
+        assert abs(result["AAPL"]["ytd"] - 0.10) < 0.0001
+        assert abs(result["ERIC-B.ST"]["ytd"] - 0.10) < 0.0001
+        mock_download.assert_called_once()
+        assert mock_download.call_args.args[0] == ["AAPL", "ERIC-B.ST"]
+        assert mock_download.call_args.kwargs["group_by"] == "ticker"
+
+    @patch("yf_api.yf.download")
+    def test_batch_returns_skips_cached(self, mock_download, yf_cache):
+        """Test that cached tickers are left out of the download."""
+        cached = {"one_month": 0.01, "ytd": 0.02}
+        yf_cache.set("returns:AAPL", cached)
+        dates = pd.to_datetime(["2024-01-02", "2024-01-03"])
+        mock_download.return_value = make_download_frame(
+            {"MSFT": pd.Series([100.0, 110.0], index=dates)}
+        )
+
+        result = get_historical_returns_batch(["AAPL", "MSFT"])
+
+        assert result["AAPL"] == cached
+        assert abs(result["MSFT"]["ytd"] - 0.10) < 0.0001
+        assert mock_download.call_args.args[0] == ["MSFT"]
+
+    @patch("yf_api.yf.download")
+    def test_batch_returns_all_cached(self, mock_download, yf_cache):
+        """Test that no download happens when everything is cached."""
+        cached = {"one_month": 0.01, "ytd": 0.02}
+        yf_cache.set("returns:AAPL", cached)
+
+        assert get_historical_returns_batch(["AAPL"]) == {"AAPL": cached}
+        mock_download.assert_not_called()
+
+    @patch("yf_api.get_historical_returns")
+    @patch("yf_api.yf.download")
+    def test_batch_returns_falls_back_per_ticker(self, mock_download, mock_single):
+        """Test that tickers missing from the download are fetched on their own."""
+        dates = pd.to_datetime(["2024-01-02", "2024-01-03"])
+        mock_download.return_value = make_download_frame(
+            {"AAPL": pd.Series([100.0, 110.0], index=dates)}
+        )
+        mock_single.return_value = {"one_month": None, "ytd": None}
+
+        result = get_historical_returns_batch(["AAPL", "MISSING"])
+
+        assert abs(result["AAPL"]["ytd"] - 0.10) < 0.0001
+        assert result["MISSING"] == {"one_month": None, "ytd": None}
+        mock_single.assert_called_once_with("MISSING", force_refresh=False)
+
+    @patch("yf_api.get_historical_returns")
+    @patch("yf_api.yf.download")
+    def test_batch_returns_refetches_all_nan_columns(self, mock_download, mock_single):
+        """Test that symbols the download failed for are fetched on their own."""
+        dates = pd.to_datetime(["2024-01-02", "2024-01-03"])
+        mock_download.return_value = make_download_frame(
+            {
+                "AAPL": pd.Series([100.0, 110.0], index=dates),
+                "FAILED": pd.Series([float("nan"), float("nan")], index=dates),
+            }
+        )
+        mock_single.return_value = {"one_month": None, "ytd": None}
+
+        result = get_historical_returns_batch(["AAPL", "FAILED"])
+
+        assert result["FAILED"] == {"one_month": None, "ytd": None}
+        mock_single.assert_called_once_with("FAILED", force_refresh=False)
+
+    @patch("yf_api.get_historical_returns")
+    @patch("yf_api.yf.download")
+    def test_batch_returns_lowercase_tickers(
+        self, mock_download, mock_single, yf_cache
+    ):
+        """Test that lowercase input matches the upper-cased download columns."""
+        dates = pd.to_datetime(["2024-01-02", "2024-01-03"])
+        mock_download.return_value = make_download_frame(
+            {"AAPL": pd.Series([100.0, 110.0], index=dates)}
+        )
+
+        result = get_historical_returns_batch(["aapl", "AAPL"])
+
+        assert mock_download.call_args.args[0] == ["AAPL"]
+        mock_single.assert_not_called()
+        assert abs(result["aapl"]["ytd"] - 0.10) < 0.0001
+        assert result["AAPL"] == result["aapl"]
+        assert yf_cache.get("returns:AAPL", max_age=60) == result["AAPL"]
+
+
+class TestReturnsFromCloseMatrix:
+    """Test the vectorized returns used by the batch path."""
+
+    def test_matches_per_ticker_returns(self):
+        """Test that every column matches the single ticker computation."""
+        dates = pd.date_range(
+            "2023-12-01", "2024-03-29", freq="B", tz="Europe/Stockholm"
+        )
+        closes = pd.DataFrame(
+            {
+                "AAPL": np.linspace(100.0, 130.0, len(dates)),
+                "ERIC-B.ST": np.linspace(50.0, 40.0, len(dates)),
+                "NEW": np.nan,
+            },
+            index=dates,
+        )
+        # Different holidays, and a listing that stopped trading early
+        closes.iloc[::7, 0] = np.nan
+        closes.iloc[-10:, 1] = np.nan
+        closes.iloc[-1, 2] = 10.0
+
+        results = _returns_from_close_matrix(closes)
+
+        for ticker in ("AAPL", "ERIC-B.ST"):
+            expected = _returns_from_closes(closes[ticker].dropna())
+            assert results[ticker] == pytest.approx(expected)
+        assert results["NEW"] == {"one_month": None, "ytd": None}
+
+    def test_empty_frame(self):
+        """Test that an empty download gives no returns."""
+        closes = pd.DataFrame(
+            {"AAPL": pd.Series([], dtype=float)}, index=pd.DatetimeIndex([])
+        )
+
+        assert _returns_from_close_matrix(closes) == {
+            "AAPL": {"one_month": None, "ytd": None}
+        }
+
+
+class TestAsyncVariants:
+    """Test the async wrappers around the blocking lookups."""
+
+    @patch("yf_api.yf.Ticker")
+    def test_async_lookups(self, mock_ticker_class, sample_historical_data):
+        """Test that the async variants return the same results."""
+        mock_ticker = Mock()
+        mock_ticker.info = {"longName": "Apple Inc."}
+        mock_ticker.fast_info = {"last_price": 150.25}
+        mock_ticker.history.return_value = sample_historical_data
+        mock_ticker_class.return_value = mock_ticker
+
+        async def lookup():
+            return await asyncio.gather(
+                get_company_name_from_ticker_async("AAPL"),
+                get_current_stock_price_async("AAPL"),
+                get_historical_returns_async("AAPL"),
+            )
+
+        name, price, returns = asyncio.run(lookup())
+
+        assert name == "Apple Inc."
+        assert price == 150.25
+        assert returns["ytd"] == pytest.approx(104.7 / 100.0 - 1.0)
+
+    @patch("yf_api.get_current_stock_price")
+    def test_async_passes_force_refresh(self, mock_price):
+        """Test that force_refresh reaches the blocking function."""
+        mock_price.return_value = 151.0
+
+        assert asyncio.run(get_current_stock_price_async("AAPL", True)) == 151.0
+        mock_price.assert_called_once_with("AAPL", True)
+
+
+class TestWarmCache:
+    """Test the warm_cache function."""
+
+    @patch("yf_api.get_current_stock_price")
+    @patch("yf_api.get_historical_returns_batch")
+    @patch("yf_api.get_company_names_from_tickers")
+    def test_warm_cache_fetches_everything(self, mock_names, mock_returns, mock_price):
+        """Test that names, returns and prices are fetched once per ticker."""
+        warm_cache(["AAPL", "MSFT", "AAPL"])
+
+        mock_names.assert_called_once_with(["AAPL", "MSFT"])
+        mock_returns.assert_called_once_with(["AAPL", "MSFT"])
+        assert sorted(call.args[0] for call in mock_price.call_args_list) == [
+            "AAPL",
+            "MSFT",
+        ]
 
-        # Should call history twice: once for YTD, once for 1-month
-        assert mock_ticker.history.call_count == 2
-        mock_ticker.history.assert_any_call(period="ytd", interval="1d")
-        mock_ticker.history.assert_any_call(period="1mo", interval="1d")
+    @patch("yf_api.get_current_stock_price")
+    @patch("yf_api.get_historical_returns_batch")
+    @patch("yf_api.get_company_names_from_tickers")
+    def test_warm_cache_empty(self, mock_names, mock_returns, mock_price):
+        """Test that nothing is fetched without tickers."""
+        warm_cache([])
+
+        mock_names.assert_not_called()
+        mock_returns.assert_not_called()
+        mock_price.assert_not_called()
+
+    @patch("yf_api.get_current_stock_price")
+    @patch("yf_api.get_historical_returns_batch")
+    @patch("yf_api.get_company_names_from_tickers")
+    def test_warm_cache_logs_failures(
+        self, mock_names, mock_returns, mock_price, caplog
+    ):
+        """Test that a failed fetch is logged and doesn't stop the others."""
+        mock_returns.side_effect = ConnectionError("down")
+
+        warm_cache(["AAPL"])
+
+        mock_names.assert_called_once()
+        mock_price.assert_called_once_with("AAPL")
+        assert "Error warming cache: down" in caplog.messages
 
 
 # Integration-style tests (these will make actual API calls, so they're marked as slow)
@@ -0,0 +1,89 @@
+import pytest
+from unittest.mock import Mock, patch
+
+from yf_session import RotatingSession
+
+HOSTS = ("query1.finance.yahoo.com", "query2.finance.yahoo.com")
+
+
+def response(status_code):
+    """Create a stand-in for a curl_cffi response."""
+    return Mock(status_code=status_code)
+
+
+@pytest.fixture
+def base_request():
+    """Patch the curl_cffi request the session delegates to."""
+    with patch("yf_session.requests.Session.request") as mock_request:
+        mock_request.return_value = response(200)
+        yield mock_request
+
+
+def requested_urls(mock_request):
+    return [call.args[1] for call in mock_request.call_args_list]
+
+
+class TestRotatingSession:
+    """Test the RotatingSession class."""
+
+    def test_rotates_hosts_round_robin(self, base_request):
+        """Test that consecutive requests go to consecutive hosts."""
+        session = RotatingSession(hosts=HOSTS)
+        url = "https://query2.finance.yahoo.com/v8/finance/chart/AAPL?range=1d"
+
+        for _ in range(3):
+            session.get(url)
+
+        assert requested_urls(base_request) == [
+            "https://query1.finance.yahoo.com/v8/finance/chart/AAPL?range=1d",
+            "https://query2.finance.yahoo.com/v8/finance/chart/AAPL?range=1d",
+            "https://query1.finance.yahoo.com/v8/finance/chart/AAPL?range=1d",
+        ]
+
+    def test_other_hosts_untouched(self, base_request):
+        """Test that non-API URLs such as the cookie endpoint aren't rewritten."""
+        session = RotatingSession(hosts=HOSTS)
+
+        session.get("https://fc.yahoo.com")
+
+        assert requested_urls(base_request) == ["https://fc.yahoo.com"]
+
+    def test_rate_limited_host_is_retried_and_skipped(self, base_request):
+        """Test that a 429 retries on the next host and cools the first one."""
+        base_request.side_effect = [response(429), response(200), response(200)]
+        session = RotatingSession(hosts=HOSTS)
+        url = "https://query1.finance.yahoo.com/v7/finance/quote"
+
+        assert session.get(url).status_code == 200
+        assert session.get(url).status_code == 200
+
+        assert [u.split("/")[2] for u in requested_urls(base_request)] == [
+            "query1.finance.yahoo.com",
+            "query2.finance.yahoo.com",
+            "query2.finance.yahoo.com",
+        ]
+
+    def test_cooldown_expires(self, base_request):
+        """Test that a cooled host is used again once the cooldown passes."""
+        base_request.side_effect = [response(429), response(200), response(200)]
+        session = RotatingSession(hosts=HOSTS, cooldown=60)
+        url = "https://query1.finance.yahoo.com/v7/finance/quote"
+
+        with patch("yf_session.time.monotonic", return_value=1000.0):
+            session.get(url)
+        with patch("yf_session.time.monotonic", return_value=1061.0):
+            session.get(url)
+
+        assert requested_urls(base_request)[-1].startswith(
+            "https://query1.finance.yahoo.com"
+        )
+
+    def test_all_hosts_rate_limited(self, base_request):
+        """Test that the 429 is returned once every host is cooling down."""
+        base_request.return_value = response(429)
+        session = RotatingSession(hosts=HOSTS)
+
+        result = session.get("https://query1.finance.yahoo.com/v7/finance/quote")
+
+        assert result.status_code == 429
+        assert base_request.call_count == len(HOSTS) + 1
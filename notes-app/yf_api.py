@@ -1,8 +1,163 @@
-import yfinance as yf
-from typing import Dict, Optional
+import asyncio
+import importlib
+import logging
+import math
+import os
+import threading
+import time
+from datetime import date
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, TypeVar
 from enum import Enum
-from contextlib import redirect_stderr
-from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from cache import TTLCache
+from config import CONFIG_DIR
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from yf_session import RotatingSession
+
+# yfinance and pandas take hundreds of milliseconds to import, so they are
+# imported inside the functions that fetch or compute and cache hits never pay
+# for them. yf_api.yf and yf_api.pd still resolve to the modules.
+_LAZY_MODULES = {"yf": "yfinance", "pd": "pandas"}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_MODULES:
+        return importlib.import_module(_LAZY_MODULES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+logger = logging.getLogger("notes_app.yf_api")
+
+
+class _QuoteNotFoundFilter(logging.Filter):
+    """Drops the 404 errors yfinance logs when a symbol has no quote.
+
+    Probing a market a ticker isn't listed on always ends in one of these, so
+    they are expected. Every other yfinance log record still gets through.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return "HTTP Error 404" not in record.getMessage()
+
+
+logging.getLogger("yfinance").addFilter(_QuoteNotFoundFilter())
+
+# Name lookups are network bound, so threads overlap the HTTP round-trips
+MAX_LOOKUP_WORKERS = 8
+
+# How long cached Yahoo Finance responses stay valid, in seconds
+NAME_MAX_AGE = 30 * 24 * 60 * 60
+PRICE_MAX_AGE = 60
+RETURNS_MAX_AGE = 60 * 60
+INVALID_MAX_AGE = 24 * 60 * 60
+
+# Transient network failures are retried, waiting RETRY_BASE_DELAY seconds and
+# three times as long before each further attempt
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.3
+RATE_LIMIT_DELAY = 5.0
+
+T = TypeVar("T")
+
+_cache = TTLCache(CONFIG_DIR / "yf_cache.sqlite3")
+
+# Shared by every request so rate limited hosts are skipped across lookups,
+# created on first use since it needs curl_cffi
+_session: Optional["RotatingSession"] = None
+_session_lock = threading.Lock()
+
+# yfinance-cache keeps its own on-disk cache of info and price history, it is
+# used for those when installed. Resolved on first use, None if not installed.
+_NOT_LOADED: Any = object()
+yfc: Any = _NOT_LOADED
+
+
+def _get_session() -> "RotatingSession":
+    global _session
+    with _session_lock:
+        if _session is None:
+            from yf_session import RotatingSession
+
+            _session = RotatingSession(impersonate="chrome")
+        return _session
+
+
+def _yfinance_cache() -> Any:
+    global yfc
+    if yfc is _NOT_LOADED:
+        try:
+            import yfinance_cache
+        except ImportError:
+            yfinance_cache = None
+        else:
+            if os.environ.get("NOTES_APP_YFC_LOG"):
+                yfinance_cache.EnableLogging()
+        yfc = yfinance_cache
+    return yfc
+
+
+def _ticker(symbol: str):
+    """Creates a ticker for info and history, through yfinance-cache if installed.
+
+    Prices don't go through here, yfinance-cache never refreshes a stored
+    fast_info so it would keep returning the first price it saw.
+    """
+    yfinance_cache = _yfinance_cache()
+    if yfinance_cache is not None:
+        return yfinance_cache.Ticker(symbol, session=_get_session())
+
+    import yfinance as yf
+
+    return yf.Ticker(symbol, session=_get_session())
+
+
+# One lock per cache key, so concurrent callers asking for the same data wait
+# for the first one's fetch and then read its result from the cache.
+_fetch_guards: Dict[str, threading.Lock] = {}
+_fetch_guards_lock = threading.Lock()
+
+
+def _fetch_guard(key: str) -> threading.Lock:
+    with _fetch_guards_lock:
+        guard = _fetch_guards.get(key)
+        if guard is None:
+            guard = _fetch_guards[key] = threading.Lock()
+        return guard
+
+
+def _with_retry(
+    fn: Callable[[], T],
+    attempts: int = RETRY_ATTEMPTS,
+    base: float = RETRY_BASE_DELAY,
+    stop: Optional[threading.Event] = None,
+) -> T:
+    """Calls `fn`, retrying transient network failures with exponential backoff.
+
+    A rate limit answer waits RATE_LIMIT_DELAY instead, by then the session has
+    moved on to another host. The last failure is re-raised, also as soon as
+    `stop` is set while waiting to retry.
+    """
+    from curl_cffi.requests.exceptions import RequestException
+    from yfinance.exceptions import YFRateLimitError
+
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except (RequestException, ConnectionError, YFRateLimitError) as e:
+            if attempt == attempts - 1:
+                raise
+            if isinstance(e, YFRateLimitError):
+                delay = RATE_LIMIT_DELAY
+            else:
+                delay = base * 3**attempt
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                raise
 
 
 class Market(Enum):
@@ -12,56 +167,411 @@ class Market(Enum):
     FRA = ".PA"
 
 
-def get_company_name_from_ticker(ticker: str) -> Optional[str]:
-    for market in Market:
-        ticker_extended = ticker.upper() + market.value
-        print(ticker_extended)
+# Enum iteration goes through the metaclass, lookups walk this tuple instead
+_MARKETS: Tuple[Market, ...] = tuple(Market)
+_MARKETS_BY_SUFFIX = {market.value: market for market in _MARKETS}
+
+
+def _probe_market(
+    ticker_extended: str, stop: Optional[threading.Event] = None
+) -> Optional[str]:
+    if stop is not None and stop.is_set():
+        return None
+    logger.debug(f"Probing {ticker_extended}")
+    try:
+        # A Ticker marks its info as fetched before the request goes out, so
+        # every attempt needs a new one
+        info = _with_retry(lambda: _ticker(ticker_extended).info, stop=stop)
+    except ValueError:
+        return None
+    if not info:
+        return None
+    return info.get("longName", None)
+
+
+def _probe_markets(
+    ticker_upper: str, markets: Tuple[Market, ...]
+) -> Optional[Tuple[Market, str]]:
+    """Probes several markets concurrently for a ticker's company name.
+
+    Results are taken in the order of `markets`, so an earlier market wins
+    even if a later one answers first, and the outcome doesn't depend on timing.
+    """
+    executor = ThreadPoolExecutor(max_workers=len(markets))
+    stop = threading.Event()
+    try:
+        futures = [
+            executor.submit(_probe_market, ticker_upper + market.value, stop)
+            for market in markets
+        ]
+        for market, future in zip(markets, futures):
+            name = future.result()
+            if name is not None:
+                return market, name
+        return None
+    finally:
+        # Every probe starts right away, so the ones still running for lower
+        # priority markets are told to give up instead of retrying. Not waiting
+        # on them returns the result without their in-flight request.
+        stop.set()
+        executor.shutdown(wait=False)
+
+
+def _lookup_company_name(ticker: str, force_refresh: bool = False) -> Optional[str]:
+    ticker_upper = ticker.upper()
+    with _fetch_guard(f"name:{ticker_upper}"):
+        return _lookup_company_name_unguarded(ticker_upper, force_refresh)
+
+
+def _lookup_company_name_unguarded(
+    ticker_upper: str, force_refresh: bool
+) -> Optional[str]:
+    markets = _MARKETS
+
+    if not force_refresh:
+        if _cache.get(f"invalid:{ticker_upper}", INVALID_MAX_AGE):
+            return None
+
+        # The market this ticker was found on last time is tried on its own first
+        known_suffix = _cache.get(f"market:{ticker_upper}", NAME_MAX_AGE)
+        if known_suffix in _MARKETS_BY_SUFFIX:
+            ticker_extended = ticker_upper + known_suffix
+            name = _cache.get(f"name:{ticker_extended}", NAME_MAX_AGE)
+            if name is None:
+                name = _probe_market(ticker_extended)
+            if name is not None:
+                _cache.set(f"name:{ticker_extended}", name)
+                return name
+            markets = tuple(m for m in _MARKETS if m.value != known_suffix)
+
+    found = _probe_markets(ticker_upper, markets)
+    if found is None:
+        # Remember misses for a while so garbage input doesn't redo the fanout
+        _cache.set(f"invalid:{ticker_upper}", True)
+        return None
+
+    market, name = found
+    _cache.set(f"name:{ticker_upper + market.value}", name)
+    _cache.set(f"market:{ticker_upper}", market.value)
+    # A forced refresh can find a ticker that was remembered as a miss
+    _cache.delete(f"invalid:{ticker_upper}")
+    return name
+
+
+def get_company_name_from_ticker(
+    ticker: str, force_refresh: bool = False
+) -> Optional[str]:
+    """Fetches the company name for a ticker, trying each market in turn.
+
+    Names are cached on disk, pass `force_refresh=True` to bypass the cache.
+    """
+    return _lookup_company_name(ticker, force_refresh)
+
+
+def get_company_names_from_tickers(
+    tickers: List[str], force_refresh: bool = False
+) -> List[Optional[str]]:
+    """Fetches the company names for several tickers concurrently.
+
+    Returns:
+        List of company names (or None if not found), in the order of `tickers`.
+    """
+    if not tickers:
+        return []
+
+    # Lookups ignore case, so duplicates like "aapl" and "AAPL" share one fetch
+    unique_tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+
+    with ThreadPoolExecutor(
+        max_workers=min(MAX_LOOKUP_WORKERS, len(unique_tickers))
+    ) as executor:
+        lookup = partial(_lookup_company_name, force_refresh=force_refresh)
+        names = dict(zip(unique_tickers, executor.map(lookup, unique_tickers)))
+    return [names[ticker.upper()] for ticker in tickers]
+
+
+def get_current_stock_price(
+    ticker: str, force_refresh: bool = False
+) -> Optional[float]:
+    """Fetches the current price of a ticker, cached for a minute."""
+    ticker = ticker.upper()
+    key = f"price:{ticker}"
+    with _fetch_guard(key):
+        if not force_refresh:
+            price = _cache.get(key, PRICE_MAX_AGE)
+            if price is not None:
+                return price
+
+        # fast_info only requests recent prices instead of the full quote summary
+        import yfinance as yf
+
+        def fetch_price():
+            # A new Ticker per attempt, see _probe_market
+            return yf.Ticker(ticker, session=_get_session()).fast_info["last_price"]
+
         try:
-            with redirect_stderr(StringIO()):  # Suppress stderr output
-                stock = yf.Ticker(ticker_extended)
-                name = stock.info.get("longName", None)
-                if name is not None:
-                    return name
-        except ValueError:
-            continue
-    return None
+            price = float(_with_retry(fetch_price))
+        except (KeyError, TypeError, ValueError):
+            return None
+        if math.isnan(price):
+            return None
+
+        _cache.set(key, price)
+        return price
+
 
+def _history_start(today: date) -> date:
+    """First day of history needed for both the YTD and the 1-month return."""
+    import pandas as pd
+
+    one_month_ago = (pd.Timestamp(today) - pd.DateOffset(months=1)).date()
+    return min(date(today.year, 1, 1), one_month_ago)
+
+
+def _returns_from_closes(closes: "pd.Series") -> Dict[str, Optional[float]]:
+    """Computes the 1-month and YTD returns from daily closes up to today."""
+    import pandas as pd
+
+    results: Dict[str, Optional[float]] = {"one_month": None, "ytd": None}
+    # Plain ndarray indexing skips the pandas indexer on every lookup
+    values = closes.to_numpy()
+    if values.size < 2:
+        return results
+
+    latest_day = closes.index[-1]
+    window_starts = {
+        "ytd": pd.Timestamp(year=latest_day.year, month=1, day=1, tz=latest_day.tz),
+        "one_month": latest_day - pd.DateOffset(months=1),
+    }
+    for key, window_start in window_starts.items():
+        # The index is sorted, so this is the first close inside the window
+        first = closes.index.searchsorted(window_start)
+        if first < values.size - 1:
+            results[key] = float(values[-1] / values[first] - 1.0)
+    return results
+
+
+def _returns_from_close_matrix(
+    closes: "pd.DataFrame",
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """Computes the returns of every column of daily closes in one pass.
+
+    Matches _returns_from_closes on each column, where a column's windows end
+    at its own last close and the days it didn't trade (NaN) are skipped.
+    """
+    import numpy as np
+    import pandas as pd
+
+    results: Dict[str, Dict[str, Optional[float]]] = {
+        ticker: {"one_month": None, "ytd": None} for ticker in closes.columns
+    }
+    values = closes.to_numpy(dtype=np.float64)
+    n_days, n_tickers = values.shape
+    valid = ~np.isnan(values)
+    has_close = valid.any(axis=0)
+    if n_days == 0 or not has_close.any():
+        return results
+
+    columns = np.arange(n_tickers)
+    last = n_days - 1 - valid[::-1].argmax(axis=0)
+    # For each row, the first row at or after it where the column has a close.
+    # The extra row catches window starts past the last day.
+    next_close = np.where(valid, np.arange(n_days)[:, None], n_days)
+    next_close = np.minimum.accumulate(next_close[::-1], axis=0)[::-1]
+    next_close = np.vstack([next_close, np.full(n_tickers, n_days)])
+
+    latest_days = closes.index[last]
+    local_days = latest_days.tz_localize(None).normalize()
+    year_starts = local_days - pd.to_timedelta(local_days.dayofyear - 1, unit="D")
+    window_starts = {
+        "ytd": year_starts.tz_localize(latest_days.tz),
+        "one_month": latest_days - pd.DateOffset(months=1),
+    }
+    latest = values[last, columns]
+    for key, window_start in window_starts.items():
+        first = next_close[closes.index.searchsorted(window_start), columns]
+        in_window = has_close & (first < last)
+        start = values[np.minimum(first, n_days - 1), columns]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = latest / start - 1.0
+        for column in np.flatnonzero(in_window):
+            results[closes.columns[column]][key] = float(returns[column])
+    return results
 
-def get_current_stock_price(ticker: str) -> Optional[float]:
-    stock = yf.Ticker(ticker)
-    return stock.info.get("currentPrice", None)
 
+def _fetch_history(ticker: str) -> Optional["pd.DataFrame"]:
+    """Fetches the daily history the returns need, or None if there is none.
 
-def get_historical_returns(ticker: str) -> Dict[str, Optional[float]]:
+    Plain yfinance logs and swallows network errors unless raise_errors is set,
+    which would leave _with_retry nothing to retry. Errors that are still there
+    once the retries run out are logged and give None, as yfinance would have.
+    """
+    from yfinance.exceptions import YFTickerMissingError
+
+    start = _history_start(date.today())
+
+    def fetch():
+        stock = _ticker(ticker)
+        # Only closes are used, actions=False drops the dividend and split
+        # columns and any rows that carried nothing else
+        if _yfinance_cache() is not None:
+            return stock.history(start=start, interval="1d", actions=False)
+        return stock.history(
+            start=start, interval="1d", actions=False, raise_errors=True
+        )
+
+    try:
+        return _with_retry(fetch)
+    except YFTickerMissingError:
+        return None
+    except Exception as e:
+        logger.warning(f"Error fetching history for {ticker}: {e}")
+        return None
+
+
+def get_historical_returns(
+    ticker: str, force_refresh: bool = False
+) -> Dict[str, Optional[float]]:
     """Fetches the 1-month and year-to-date returns for a given stock ticker.
 
+    Both returns come from a single daily history request covering whichever
+    window starts earlier. Results are cached for an hour, pass
+    `force_refresh=True` to bypass the cache.
+
     Returns:
         Dict with keys:
         - 'one_month': 1-month return as percentage (e.g., 0.05 for 5%)
         - 'ytd': Year-to-date return as percentage (e.g., 0.15 for 15%)
     """
-    stock = yf.Ticker(ticker)
+    ticker = ticker.upper()
+    key = f"returns:{ticker}"
+    with _fetch_guard(key):
+        if not force_refresh:
+            cached = _cache.get(key, RETURNS_MAX_AGE)
+            if cached is not None:
+                return cached
 
-    # Get YTD data
-    ytd_data = stock.history(period="ytd", interval="1d")
-    # Get 1-month data
-    one_month_data = stock.history(period="1mo", interval="1d")
+        history = _fetch_history(ticker)
+        if history is None:
+            return {"one_month": None, "ytd": None}
 
-    results: Dict[str, Optional[float]] = {"one_month": None, "ytd": None}
+        results = _returns_from_closes(history["Close"])
+        if any(value is not None for value in results.values()):
+            _cache.set(key, results)
+        return results
 
-    # Calculate YTD return
-    if not ytd_data.empty and len(ytd_data) > 1:
-        ytd_start = ytd_data["Close"].iloc[0]
-        ytd_latest = ytd_data["Close"].iloc[-1]
-        results["ytd"] = (ytd_latest - ytd_start) / ytd_start
 
-    # Calculate 1-month return
-    if not one_month_data.empty and len(one_month_data) > 1:
-        one_month_start = one_month_data["Close"].iloc[0]
-        one_month_latest = one_month_data["Close"].iloc[-1]
-        results["one_month"] = (one_month_latest - one_month_start) / one_month_start
+def get_historical_returns_batch(
+    tickers: List[str], force_refresh: bool = False
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """Fetches the 1-month and year-to-date returns for several tickers.
 
-    return results
+    Tickers that aren't cached are downloaded together with one yf.download
+    call. Any ticker that download has no prices for is fetched on its own,
+    with those requests run concurrently.
+
+    Returns:
+        Dict mapping each ticker to the dict returned by get_historical_returns.
+    """
+    # yf.download upper-cases symbols, so they are matched and cached that way
+    symbols = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+    results: Dict[str, Dict[str, Optional[float]]] = {}
+    if not force_refresh:
+        for symbol in symbols:
+            cached = _cache.get(f"returns:{symbol}", RETURNS_MAX_AGE)
+            if cached is not None:
+                results[symbol] = cached
+
+    missing = [symbol for symbol in symbols if symbol not in results]
+    if missing:
+        import yfinance as yf
+
+        data = yf.download(
+            missing,
+            start=_history_start(date.today()),
+            interval="1d",
+            group_by="ticker",
+            threads=True,
+            progress=False,
+            session=_get_session(),
+        )
+
+        # Symbols the download failed for come back as all-NaN columns
+        downloaded = [
+            symbol
+            for symbol in missing
+            if (symbol, "Close") in data.columns
+            and data[(symbol, "Close")].notna().any()
+        ]
+        not_downloaded = [symbol for symbol in missing if symbol not in downloaded]
+        if downloaded:
+            closes = data.loc[:, [(symbol, "Close") for symbol in downloaded]]
+            closes.columns = downloaded
+            for symbol, returns in _returns_from_close_matrix(closes).items():
+                results[symbol] = returns
+                if any(value is not None for value in returns.values()):
+                    _cache.set(f"returns:{symbol}", returns)
+
+        if not_downloaded:
+            fetch = partial(get_historical_returns, force_refresh=force_refresh)
+            with ThreadPoolExecutor(
+                max_workers=min(MAX_LOOKUP_WORKERS, len(not_downloaded))
+            ) as executor:
+                results.update(
+                    zip(not_downloaded, executor.map(fetch, not_downloaded))
+                )
+
+    return {ticker: results[ticker.upper()] for ticker in tickers}
+
+
+# Async variants run the blocking lookups in worker threads, so callers on an
+# event loop can await several tickers at once with asyncio.gather.
+async def get_company_name_from_ticker_async(
+    ticker: str, force_refresh: bool = False
+) -> Optional[str]:
+    """Async variant of get_company_name_from_ticker."""
+    return await asyncio.to_thread(get_company_name_from_ticker, ticker, force_refresh)
+
+
+async def get_current_stock_price_async(
+    ticker: str, force_refresh: bool = False
+) -> Optional[float]:
+    """Async variant of get_current_stock_price."""
+    return await asyncio.to_thread(get_current_stock_price, ticker, force_refresh)
+
+
+async def get_historical_returns_async(
+    ticker: str, force_refresh: bool = False
+) -> Dict[str, Optional[float]]:
+    """Async variant of get_historical_returns."""
+    return await asyncio.to_thread(get_historical_returns, ticker, force_refresh)
+
+
+def warm_cache(tickers: List[str]) -> None:
+    """Fetches names, prices and returns for `tickers` ahead of time.
+
+    Meant to run before interactive use, e.g. from cron, so later lookups are
+    served from the cache. Data that is already cached isn't fetched again, and
+    failures are logged rather than raised.
+    """
+    unique_tickers = list(dict.fromkeys(tickers))
+    if not unique_tickers:
+        return
+
+    with ThreadPoolExecutor(max_workers=MAX_LOOKUP_WORKERS) as executor:
+        futures = [
+            executor.submit(get_company_names_from_tickers, unique_tickers),
+            executor.submit(get_historical_returns_batch, unique_tickers),
+        ]
+        futures.extend(
+            executor.submit(get_current_stock_price, ticker)
+            for ticker in unique_tickers
+        )
+
+    for future in futures:
+        error = future.exception()
+        if error is not None:
+            logger.warning(f"Error warming cache: {error}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from curl_cffi import requests
+
+logger = logging.getLogger("notes_app.yf_session")
+
+# Yahoo Finance serves the same API from all of these, but rate limits each
+# host separately
+YAHOO_QUERY_HOSTS = tuple(f"query{n}.finance.yahoo.com" for n in range(1, 6))
+
+# How long a host that answered 429 is skipped, in seconds
+HOST_COOLDOWN = 60
+
+
+class RotatingSession(requests.Session):
+    """curl_cffi session that spreads Yahoo Finance API calls over its hosts.
+
+    yfinance sends every request to query1 or query2. Requests to any of
+    `hosts` are instead sent to the next host in round-robin order, and a host
+    that answers 429 Too Many Requests is skipped for `cooldown` seconds while
+    the request is retried on the next one. Other URLs are left untouched.
+    """
+
+    def __init__(
+        self,
+        *args,
+        hosts: tuple = YAHOO_QUERY_HOSTS,
+        cooldown: float = HOST_COOLDOWN,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.hosts = hosts
+        self.cooldown = cooldown
+        self._next_host = 0
+        self._cooling_until: Dict[str, float] = {}
+        self._hosts_lock = threading.Lock()
+
+    def _pick_host(self) -> Optional[str]:
+        """Return the next host that isn't cooling down, or None if all are."""
+        with self._hosts_lock:
+            now = time.monotonic()
+            for _ in range(len(self.hosts)):
+                host = self.hosts[self._next_host]
+                self._next_host = (self._next_host + 1) % len(self.hosts)
+                if self._cooling_until.get(host, 0.0) <= now:
+                    return host
+            return None
+
+    def _cool_down(self, host: str) -> None:
+        with self._hosts_lock:
+            self._cooling_until[host] = time.monotonic() + self.cooldown
+        logger.debug(f"{host} is rate limited, skipping it for {self.cooldown}s")
+
+    def request(self, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        if parts.hostname not in self.hosts:
+            return super().request(method, url, *args, **kwargs)
+
+        for _ in range(len(self.hosts)):
+            host = self._pick_host()
+            if host is None:
+                break
+            rotated_url = urlunsplit(parts._replace(netloc=host))
+            response = super().request(method, rotated_url, *args, **kwargs)
+            if response.status_code != 429:
+                return response
+            self._cool_down(host)
+
+        # Every host is rate limited, let the caller see Yahoo's answer
+        return super().request(method, url, *args, **kwargs)